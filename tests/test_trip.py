@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import trip
+
+
+def test_429_pauses_requests_already_waiting_in_limiter():
+    """
+    Requests queued inside the rate limiter when a 429 arrives must wait
+    for the pause to end instead of being sent during it.
+    """
+    retry_after = 1.0
+    sent = []
+    throttled_at = []
+
+    async def handler(request):
+        now = time.monotonic()
+        sent.append(now)
+        if request.url.path == "/0" and not throttled_at:
+            # Answer late so the other tasks are already queued in the limiter
+            await asyncio.sleep(0.05)
+            throttled_at.append(time.monotonic())
+            return httpx.Response(429, headers={"Retry-After": str(retry_after)})
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text="ok")
+
+    async def run():
+        throttle = trip.RequestThrottle()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            responses = await asyncio.gather(*(
+                trip.get_with_retry(f"http://test/{i}", client, throttle) for i in range(30)
+            ))
+        return [response.status_code for response in responses]
+
+    assert asyncio.run(run()) == [200] * 30
+    pause_start = throttled_at[0]
+    # Nothing may be sent between the 429 and the end of Retry-After
+    during_pause = [t for t in sent if pause_start < t < pause_start + retry_after - 0.05]
+    assert during_pause == []
+
+
+def test_partial_entry_found_behind_deeply_nested_markup():
+    """
+    Entries behind very deep nesting (here more than 256 nested <div>s)
+    are still found instead of falling back to the whole page text.
+    """
+    page = (
+        b"<html><body>" + b"<div>" * 400
+        + b'<div class="partial_entry">Hello <b>AI</b></div>'
+        + b"<p>filler</p>" * 1000 + b"</body></html>"
+    )
+    assert trip.parse_detail_bytes(page, "utf-8") == "Hello AI"
+
+
+def test_parse_html_uses_charset_from_http_header():
+    """
+    A non-UTF-8 charset from the Content-Type header is honoured even
+    when the page itself declares nothing.
+    """
+    page = "<html><body><p>café résumé</p></body></html>".encode("iso-8859-1")
+    assert trip.parse_html(page, "iso-8859-1").body.text(strip=True) == "café résumé"
+    assert trip.parse_html(page, "no-such-charset").body is not None
+
+
+def test_env_proxy_for_honours_proxy_variables(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
+                 "http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    assert trip.env_proxy_for("https://www.tripadvisor.com/SearchForums") is None
+
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.local:3128")
+    assert trip.env_proxy_for("https://www.tripadvisor.com/SearchForums") == "http://proxy.local:3128"
+
+    monkeypatch.setenv("NO_PROXY", "tripadvisor.com")
+    assert trip.env_proxy_for("https://www.tripadvisor.com/SearchForums") is None
+
+
+def test_retry_after_above_limit_is_not_waited_for():
+    """
+    A Retry-After beyond MAX_RETRY_AFTER gives up immediately instead of
+    pausing the whole scrape for that long.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(429, headers={"Retry-After": "86400"})
+
+    async def run():
+        throttle = trip.RequestThrottle()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.wait_for(trip.get_with_retry("http://test/a", client, throttle), 5)
+
+    assert asyncio.run(run()).status_code == 429
+    assert len(calls) == 1
+
+
+def test_scrape_forum_raises_when_writing_fails(monkeypatch, tmp_path):
+    """
+    An error in a worker (here a full disk while writing a row) must end
+    the scrape with that error instead of leaving it waiting forever.
+    """
+    def handler(request):
+        if request.url.path == "/search":
+            rows = "".join(
+                f'<tr class="topicrow"><td><a href="/ShowTopic-{i}.html">AI {i}</a></td></tr>'
+                # More rows than workers, so every worker hits the error
+                for i in range(2 * trip.NUM_WORKERS)
+            )
+            body = f'<table class="forumsearchresults">{rows}</table>'
+        else:
+            body = '<div class="partial_entry">AI itinerary</div>'
+        return httpx.Response(200, text=f"<html><body>{body}</body></html>")
+
+    def fail_write(self, row):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(trip.httpx, "AsyncHTTPTransport", lambda **kwargs: httpx.MockTransport(handler))
+    monkeypatch.setattr(trip.ResultWriter, "writerow", fail_write)
+
+    async def run():
+        scrape = trip.scrape_forum("http://test/search", ["AI"], str(tmp_path / "out.csv"))
+        return await asyncio.wait_for(scrape, 10)
+
+    with pytest.raises(OSError, match="No space left"):
+        asyncio.run(run())
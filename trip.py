@@ -4,12 +4,14 @@ TripAdvisor Forum Full Comments Scraper and CSV Exporter
 
 This script scrapes forum search results from TripAdvisor asynchronously.
 It extracts topics and comments, fetches full text from detail pages,
-filters results based on specified keywords, and then saves the filtered
-results to a CSV file.
+filters results based on specified keywords while scraping, and writes
+the filtered results to a CSV file as they come in.
 
 Dependencies (install via requirements.txt):
     - httpx         (for asynchronous HTTP requests)
-    - beautifulsoup4 (for HTML parsing)
+    - selectolax    (for fast HTML parsing)
+    - aiolimiter    (for rate limiting requests)
+    - pyahocorasick (for fast multi-keyword matching)
 
 Usage Example:
     python scraper.py --url "https://www.tripadvisor.com/SearchForums?q=AI+trip+itinerary" --max_pages 50 --output output.csv
@@ -17,15 +19,34 @@ Usage Example:
 
 import asyncio
 import csv
+import multiprocessing
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import httpx  # Asynchronous HTTP client
-from bs4 import BeautifulSoup  # For parsing HTML content
-from urllib.parse import urljoin
+from aiolimiter import AsyncLimiter  # Async rate limiter
+import ahocorasick  # Aho-Corasick automaton for multi-keyword search
+from selectolax.lexbor import LexborHTMLParser  # Fast C-backed HTML parser
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
 import argparse
 
 # Define keywords for filtering search results (case-insensitive match)
 KEYWORDS = ["AI", "Itinerary"]
 
-# Maximum number of pages to scrape (can be adjusted via command line)
+# Columns of the CSV output file; result rows are (type, text, detail_url) tuples
+CSV_FIELDS = ["type", "text", "detail_url"]
+
+# Write buffer for the CSV output and how often streamed rows are flushed to disk
+CSV_BUFFER_SIZE = 1 << 20
+FLUSH_EVERY_ROWS = 500
+FLUSH_INTERVAL = 5.0
+
+# Default maximum number of pages to scrape (can be adjusted via command line)
 MAX_PAGES = 50
 
 # Extended headers to mimic a real browser for HTTP requests
@@ -45,130 +66,445 @@ HEADERS = {
     "Sec-Fetch-User": "?1",
 }
 
-async def fetch_full_text(detail_url: str, client: httpx.AsyncClient) -> str:
+# Start parser processes with "spawn": the default "fork" would copy a parent
+# that already runs httpx/asyncio threads (e.g. DNS lookups), which can
+# deadlock the child
+PARSER_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Number of worker tasks fetching detail pages and size of the row queue.
+# Each worker fetches one detail page at a time, so NUM_WORKERS is also the
+# cap on concurrent detail requests
+NUM_WORKERS = 32
+QUEUE_SIZE = 256
+
+# Maximum number of detail pages whose full text is kept for reuse
+DETAIL_CACHE_SIZE = 10_000
+
+# Connection pool limits for the shared HTTP/2 client (single host workload)
+LIMITS = httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=30.0)
+
+# At most 10 requests per second across all tasks
+RATE_LIMIT = 10
+
+# Retry settings for throttled or temporarily unavailable responses
+MAX_RETRIES = 5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Longest Retry-After (in seconds) we are willing to wait; longer requests count as failures
+MAX_RETRY_AFTER = 120.0
+
+def env_proxy_for(url: str):
     """
-    Fetch the detail page of a topic or comment and extract the full text.
+    Return the proxy URL the environment configures for url
+    (HTTP_PROXY / HTTPS_PROXY / ALL_PROXY, honouring NO_PROXY), or None.
+    httpx only reads these variables itself when no custom transport is
+    given, so the scraper resolves them for its transport.
+    """
+    parts = urlsplit(url)
+    if not parts.hostname or proxy_bypass(parts.hostname):
+        return None
+    proxies = getproxies()
+    return proxies.get(parts.scheme) or proxies.get("all")
+
+def retry_after_delay(response: httpx.Response):
+    """
+    Return the number of seconds requested by the Retry-After header,
+    or None if the header is missing or cannot be parsed.
+    The header may hold either a number of seconds or an HTTP date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RequestThrottle:
+    """
+    Request controls shared by all tasks of one scrape: the rate limiter
+    and the global pause after 429 responses. asyncio primitives belong to the event loop that
+    first uses them, so every scrape_forum call creates its own throttle.
+    """
+
+    def __init__(self):
+        self.limiter = AsyncLimiter(RATE_LIMIT, 1)
+        # Cleared while all requests are paused after a 429 response
+        self.requests_allowed = asyncio.Event()
+        self.requests_allowed.set()
+
+    async def pause(self, delay: float):
+        """
+        Pause every task's requests for delay seconds.
+        If a pause is already running, wait for it to end instead of starting
+        another one, so a burst of 429 responses leads to a single back-off.
+        """
+        if not self.requests_allowed.is_set():
+            await self.requests_allowed.wait()
+            return
+        self.requests_allowed.clear()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.requests_allowed.set()
+
+async def get_with_retry(url: str, client: httpx.AsyncClient, throttle: RequestThrottle) -> httpx.Response:
+    """
+    GET the given URL through the rate limiter, retrying throttled and
+    failed requests with exponential back-off.
+    On 429/503 the Retry-After header is honoured when present; a 429
+    pauses all requests, not just this one, for the back-off period.
+    A Retry-After longer than MAX_RETRY_AFTER is treated as a permanent
+    failure and the response is returned right away with a warning.
+    Returns the last response received; re-raises the last network error
+    if every attempt failed.
+    """
+    for attempt in range(MAX_RETRIES):
+        last_attempt = attempt == MAX_RETRIES - 1
+        throttled = False
+        # Wait out a global pause started by a 429 in any task
+        await throttle.requests_allowed.wait()
+        try:
+            async with throttle.limiter:
+                # A pause may have started while this task was queued in the
+                # limiter; check again right before sending
+                while not throttle.requests_allowed.is_set():
+                    await throttle.requests_allowed.wait()
+                response = await client.get(url)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            throttled = response.status_code == 429
+            delay = retry_after_delay(response) if response.status_code in (429, 503) else None
+            if delay is not None and delay > MAX_RETRY_AFTER:
+                print(f"Warning: {url} asked to retry after {delay:.0f}s "
+                      f"(more than {MAX_RETRY_AFTER:.0f}s); not retrying")
+                return response
+        if delay is None:
+            # Exponential back-off with jitter: ~1s, 2s, 4s, 8s
+            delay = 2 ** attempt + random.uniform(0, 1)
+        if throttled:
+            await throttle.pause(delay)
+        else:
+            await asyncio.sleep(delay)
+
+async def fetch_full_text_cached(detail_url: str, client: httpx.AsyncClient, throttle: RequestThrottle,
+                                 cache: OrderedDict, executor: Executor = None) -> str:
+    """
+    Like fetch_full_text, but reuses the result for detail pages that were
+    already fetched during this run (the same topic often shows up on
+    several search result pages). The cache maps detail URLs to fetch
+    tasks, so concurrent requests for the same URL share a single fetch.
+    The least recently used entries are dropped beyond DETAIL_CACHE_SIZE,
+    and failed fetches are not cached.
+    """
+    task = cache.get(detail_url)
+    if task is None:
+        task = asyncio.ensure_future(fetch_full_text(detail_url, client, throttle, executor))
+        cache[detail_url] = task
+        if len(cache) > DETAIL_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(detail_url)
+    full_text = await task
+    if not full_text and cache.get(detail_url) is task:
+        # Let a later occurrence of the URL try again
+        del cache[detail_url]
+    return full_text
+
+def parse_html(content: bytes, encoding: str = None) -> LexborHTMLParser:
+    """
+    Parse raw response bytes, using the charset declared in the HTTP header.
+    UTF-8 bytes are handed to the parser as-is without a decode pass, other
+    declared charsets are decoded first, and only when no (known) charset
+    was declared does the parser sniff the encoding from the BOM and <meta>.
+    """
+    if encoding:
+        if encoding.lower().replace("_", "-") in ("utf-8", "utf8"):
+            return LexborHTMLParser(content)
+        try:
+            return LexborHTMLParser(content.decode(encoding, "replace"))
+        except LookupError:
+            # Unknown charset label; fall back to sniffing
+            pass
+    return LexborHTMLParser(content, encoding=True)
+
+def parse_detail_bytes(content: bytes, encoding: str = None) -> str:
+    """
+    Extract the full text from the raw bytes of a detail page.
     Adjust the selector as needed based on the page's HTML structure.
+    This is a top-level function so it can run in a worker process.
+    """
+    tree = parse_html(content, encoding)
+    # Look for the HTML element that contains the full text.
+    # This example assumes a <div> with class "partial_entry".
+    full_text_elem = tree.css_first("div.partial_entry")
+    if full_text_elem:
+        return full_text_elem.text(separator=" ", strip=True)
+    # Fallback: return all text from the page if the specific element isn't found
+    root = tree.body or tree.root
+    return root.text(separator=" ", strip=True) if root else ""
+
+async def fetch_full_text(detail_url: str, client: httpx.AsyncClient, throttle: RequestThrottle,
+                          executor: Executor = None) -> str:
+    """
+    Fetch the detail page of a topic or comment and extract the full text.
+    If an executor is given the page is parsed there, keeping the CPU-bound
+    parsing off the event loop; only the extracted text is sent back.
     """
     try:
-        response = await client.get(detail_url)
+        response = await get_with_retry(detail_url, client, throttle)
         if response.status_code != 200:
             # Return empty string if the page isn't fetched successfully
+            print(f"Warning: giving up on {detail_url}: Status code {response.status_code}")
             return ""
-        soup = BeautifulSoup(response.text, "html.parser")
-        # Look for the HTML element that contains the full text.
-        # This example assumes a <div> with class "partial_entry".
-        full_text_elem = soup.find("div", class_="partial_entry")
-        if full_text_elem:
-            return full_text_elem.get_text(separator=" ", strip=True)
-        # Fallback: return all text from the page if the specific element isn't found
-        return soup.get_text(separator=" ", strip=True)
-    except Exception:
+        # Parse the raw bytes directly; response.text is never decoded
+        if executor is None:
+            return parse_detail_bytes(response.content, response.charset_encoding)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, parse_detail_bytes, response.content, response.charset_encoding
+        )
+    except Exception as exc:
         # In case of any errors, return an empty string
+        print(f"Warning: failed to fetch {detail_url}: {exc!r}")
         return ""
 
-async def process_page(page_url: str, client: httpx.AsyncClient) -> (list, str):
+def resolve_href(origin: str, page_url: str, href: str) -> str:
+    """
+    Resolve an href found on page_url into an absolute URL.
+    Absolute and root-relative links (almost all links on TripAdvisor) are
+    handled with plain string operations; anything else goes through urljoin.
+    origin is the "scheme://netloc" part of page_url.
+    """
+    if href.startswith(("https://", "http://")):
+        return href
+    if href.startswith("/") and not href.startswith("//"):
+        return origin + href
+    return urljoin(page_url, href)
+
+async def process_page(page_url: str, client: httpx.AsyncClient, throttle: RequestThrottle,
+                       automaton: ahocorasick.Automaton = None) -> (list, str):
     """
     Process one search result page.
+    Only the rows and the pagination are parsed here; detail pages are
+    fetched separately by the consumer workers.
+    If an automaton is given, rows whose short text contains none of its
+    keywords are skipped, so their detail pages are never fetched.
     Returns a tuple:
-      (list of result dictionaries, URL of the next page or None)
-    Each result dictionary contains:
-      - "type": Indicates if it is a Topic or Comment.
-      - "text": The extracted (full or short) text.
-      - "detail_url": The URL to the full detail page.
-    """
-    results = []
-    response = await client.get(page_url)
+      (list of row tuples, URL of the next page or None)
+    Each row tuple contains:
+      - row_type: Indicates if it is a Topic or Comment.
+      - short_text: The link text shown on the search result page.
+      - detail_url: The URL to the full detail page.
+    """
+    tasks = []
+    response = await get_with_retry(page_url, client, throttle)
     if response.status_code != 200:
         print(f"Error fetching {page_url}: Status code {response.status_code}")
-        return results, None
+        return tasks, None
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    results_table = soup.find("table", class_="forumsearchresults")
+    tree = parse_html(response.content, response.charset_encoding)
+    results_table = tree.css_first("table.forumsearchresults")
     if not results_table:
         print(f"No forum search results table found in {page_url}")
-        return results, None
+        return tasks, None
+
+    # Split the page URL once so links can be resolved without urljoin
+    parts = urlsplit(page_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
 
     # Find all rows with 'topicrow' or 'postrow' classes
-    rows = results_table.find_all("tr", class_=lambda c: c and ("topicrow" in c or "postrow" in c))
-    tasks = []
+    rows = results_table.css("tr.topicrow, tr.postrow")
     for row in rows:
-        row_classes = row.get("class", [])
-        a_tag = row.find("a", href=True)
+        row_classes = (row.attributes.get("class") or "").split()
+        a_tag = row.css_first("a[href]")
         if not a_tag:
             continue
-        short_text = a_tag.get_text(strip=True)
-        detail_url = urljoin(page_url, a_tag["href"])
+        short_text = a_tag.text(strip=True)
+        # Cheap pre-filter on the title shown in the search results
+        if automaton is not None and not contains_keyword(automaton, short_text.lower()):
+            continue
+        detail_url = resolve_href(origin, page_url, a_tag.attributes.get("href") or "")
         row_type = "Topic" if "topicrow" in row_classes else "Comment"
         tasks.append((row_type, short_text, detail_url))
 
-    # Fetch the full text for each result asynchronously
-    for row_type, short_text, detail_url in tasks:
-        full_text = await fetch_full_text(detail_url, client)
-        # Use full text if available; otherwise, fallback to the short text
-        text = full_text if full_text.strip() != "" else short_text
-        results.append({
-            "type": row_type,
-            "text": text,
-            "detail_url": detail_url,
-        })
-
     # Extract the URL for the next page from the pagination section
     next_page = None
-    pagination_div = soup.find("div", class_="pagination")
-    if pagination_div:
-        # Find a link with text "Next"
-        next_link = pagination_div.find("a", string=lambda s: s and "Next" in s)
-        if next_link and next_link.get("href"):
-            next_page = urljoin(page_url, next_link["href"])
-    return results, next_page
+    # Find a link with text "Next"; the selector does the structural matching
+    # in C, so only the handful of pagination links are checked in Python
+    for next_link in tree.css("div.pagination a[href]"):
+        if "Next" in next_link.text():
+            href = next_link.attributes.get("href")
+            if href:
+                next_page = resolve_href(origin, page_url, href)
+            break
+    return tasks, next_page
+
+async def produce_rows(start_url: str, client: httpx.AsyncClient, throttle: RequestThrottle,
+                       queue: asyncio.Queue, max_pages: int, automaton: ahocorasick.Automaton = None):
+    """
+    Walk up to max_pages search result pages starting from start_url and put
+    every row onto the queue. Moves on to the next page as soon as the current page's
+    rows are queued, without waiting for their detail pages.
+    Returns once every queued row has been processed by the workers.
+    The optional automaton is passed on to process_page to pre-filter rows.
+    """
+    current_url = start_url
+    page_count = 0
+    # Continue looping while there is a next page and within the page limit
+    while current_url and page_count < max_pages:
+        print(f"Processing page {page_count + 1}: {current_url}")
+        tasks, next_page = await process_page(current_url, client, throttle, automaton)
+        for task in tasks:
+            await queue.put(task)
+        current_url = next_page
+        page_count += 1
+    await queue.join()
+
+class ResultWriter:
+    """
+    Write result rows to an open CSV file one row at a time
+    and keep track of how many rows were written.
+    The file is flushed every FLUSH_EVERY_ROWS rows or FLUSH_INTERVAL seconds,
+    whichever comes first, so partial results survive an interrupted run
+    without a write call per row.
+    """
+
+    def __init__(self, csvfile):
+        self.csvfile = csvfile
+        # csv.writer formats whole rows in C; DictWriter adds a Python-level
+        # dict-to-list conversion for every row
+        self.writer = csv.writer(csvfile)
+        self.writer.writerow(CSV_FIELDS)
+        self.rows_written = 0
+        self.pending_rows = 0
+        self.last_flush = time.monotonic()
 
-async def scrape_forum(start_url: str) -> list:
+    def writerow(self, row: tuple):
+        self.writer.writerow(row)
+        self.rows_written += 1
+        self.pending_rows += 1
+        now = time.monotonic()
+        if self.pending_rows >= FLUSH_EVERY_ROWS or now - self.last_flush >= FLUSH_INTERVAL:
+            self.csvfile.flush()
+            self.pending_rows = 0
+            self.last_flush = now
+
+async def consume_rows(client: httpx.AsyncClient, throttle: RequestThrottle, queue: asyncio.Queue,
+                       writer: ResultWriter, cache: OrderedDict, automaton: ahocorasick.Automaton = None,
+                       executor: Executor = None):
+    """
+    Take rows off the queue, fetch the full text of their detail pages
+    (through the shared detail cache) and write the resulting rows
+    to the result writer. If an automaton is given, only rows whose text
+    contains one of its keywords are kept. Detail pages are parsed in the
+    executor when one is given. Runs until cancelled.
+    """
+    while True:
+        row_type, short_text, detail_url = await queue.get()
+        try:
+            full_text = await fetch_full_text_cached(detail_url, client, throttle, cache, executor)
+            # Use full text if available; otherwise, fallback to the short text
+            text = full_text if full_text.strip() != "" else short_text
+            # Drop non-matching rows right away instead of keeping their text around
+            if automaton is not None and not contains_keyword(automaton, text.lower()):
+                continue
+            writer.writerow((row_type, text, detail_url))
+        finally:
+            queue.task_done()
+
+async def scrape_forum(start_url: str, keywords: list, filename: str = "output.csv",
+                       max_pages: int = MAX_PAGES, require_full_text: bool = True) -> int:
     """
     Scrape multiple pages starting from start_url.
-    Follows "Next" links until no more pages are found or the maximum number of pages is reached.
-    Returns a list of all scraped result dictionaries.
-    """
-    all_results = []
-    async with httpx.AsyncClient(headers=HEADERS, timeout=150.0, follow_redirects=True, http2=True) as client:
-        current_url = start_url
-        page_count = 0
-        # Continue looping while there is a next page and within the page limit
-        while current_url and page_count < MAX_PAGES:
-            print(f"Processing page {page_count + 1}: {current_url}")
-            page_results, next_page = await process_page(current_url, client)
-            all_results.extend(page_results)
-            current_url = next_page
-            page_count += 1
-    return all_results
-
-def filter_results(results: list, keywords: list) -> list:
-    """
-    Filter results to include only those that contain any of the specified keywords
-    (case-insensitive match) in their text.
-    """
-    filtered = []
-    for item in results:
-        # Check if any keyword exists in the text
-        if any(keyword.lower() in item["text"].lower() for keyword in keywords):
-            filtered.append(item)
-    return filtered
-
-def save_to_csv(results: list, filename: str = "output.csv"):
-    """
-    Save the list of result dictionaries to a CSV file.
-    Each row in the CSV will have columns: type, text, and detail_url.
-    """
-    with open(filename, mode="w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=["type", "text", "detail_url"])
-        writer.writeheader()
-        for item in results:
-            writer.writerow(item)
+    Follows "Next" links until no more pages are found or max_pages pages have been processed.
+    Search pages are walked by a single producer while a pool of workers
+    fetches the detail pages, so both stages overlap.
+    Results are filtered by the keywords as they are scraped.
+    With require_full_text (the default) every detail page is fetched and the
+    keywords are matched against the full text. Otherwise the keywords are
+    matched against the titles on the search pages and only matching rows
+    have their detail page fetched.
+    Matching results are written to the CSV file as soon as they are built,
+    so they are never collected in memory.
+    Detail pages are parsed in a pool of worker processes (one per CPU) while
+    the network I/O stays on the event loop.
+    Returns the number of results written.
+    """
+    automaton = build_keyword_automaton(keywords)
+    # Match either the full text in the workers or the titles in the producer
+    text_automaton = automaton if require_full_text else None
+    title_automaton = None if require_full_text else automaton
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    detail_cache = OrderedDict()
+    throttle = RequestThrottle()
+    # The transport owns the connection pool, so HTTP/2, the pool limits,
+    # connection retries and the environment proxy (resolved once for the
+    # start URL; all requests go to the same host) are configured on it
+    # rather than on the client
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=LIMITS, retries=2, proxy=env_proxy_for(start_url)
+    )
+    with open(filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as csvfile, \
+            ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=PARSER_MP_CONTEXT) as executor:
+        writer = ResultWriter(csvfile)
+        async with httpx.AsyncClient(headers=HEADERS, timeout=150.0, follow_redirects=True, transport=transport) as client:
+            workers = [
+                asyncio.create_task(consume_rows(client, throttle, queue, writer, detail_cache, text_automaton, executor))
+                for _ in range(NUM_WORKERS)
+            ]
+            producer = asyncio.create_task(
+                produce_rows(start_url, client, throttle, queue, max_pages, title_automaton)
+            )
+            try:
+                # Workers only ever stop by raising; wait for the producer to
+                # finish or any task to fail, whichever happens first, so a dead
+                # worker pool cannot leave the producer or queue.join() hanging
+                done, _ = await asyncio.wait({producer, *workers}, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+            finally:
+                for task in (producer, *workers):
+                    task.cancel()
+                await asyncio.gather(producer, *workers, return_exceptions=True)
+    return writer.rows_written
+
+def build_keyword_automaton(keywords: list) -> ahocorasick.Automaton:
+    """
+    Build an Aho-Corasick automaton over the lowercased keywords so that
+    all of them can be searched for in a single pass over a text.
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword.lower(), keyword)
+    automaton.make_automaton()
+    return automaton
+
+def contains_keyword(automaton: ahocorasick.Automaton, text: str) -> bool:
+    """
+    Return True if the (already lowercased) text contains any keyword of the automaton.
+    """
+    # An automaton without keywords is never finalized and matches nothing
+    if automaton.kind != ahocorasick.AHOCORASICK:
+        return False
+    return next(automaton.iter(text), None) is not None
 
 def main():
     """
-    Main function to parse command-line arguments, perform scraping,
-    filter the results, and save them to a CSV file.
+    Main function to parse command-line arguments, scrape the results
+    matching the keywords, and stream them to a CSV file.
     """
     parser = argparse.ArgumentParser(
         description="TripAdvisor Forum Full Comments Scraper and CSV Exporter"
@@ -182,7 +518,7 @@ def main():
     parser.add_argument(
         "--max_pages",
         type=int,
-        default=50,
+        default=MAX_PAGES,
         help="Maximum number of pages to scrape"
     )
     parser.add_argument(
@@ -191,22 +527,20 @@ def main():
         default="output.csv",
         help="CSV output filename"
     )
+    parser.add_argument(
+        "--title_only",
+        action="store_true",
+        help="Match keywords against result titles only and skip detail pages of non-matching rows"
+    )
     args = parser.parse_args()
 
-    # Update global MAX_PAGES based on user input
-    global MAX_PAGES
-    MAX_PAGES = args.max_pages
-
-    # Run the asynchronous scraping process and get the results
-    results = asyncio.run(scrape_forum(args.url))
-    print(f"Total results scraped: {len(results)}")
-
-    # Filter results to include only entries containing the keywords
-    filtered = filter_results(results, KEYWORDS)
-    print(f"Total results after filtering: {len(filtered)}")
-
-    # Save the filtered results to a CSV file
-    save_to_csv(filtered, args.output)
+    # Run the asynchronous scraping process; only entries containing the
+    # keywords are written to the CSV file while scraping
+    written = asyncio.run(scrape_forum(
+        args.url, KEYWORDS, args.output,
+        max_pages=args.max_pages, require_full_text=not args.title_only
+    ))
+    print(f"Total results after filtering: {written}")
     print(f"Filtered results saved to {args.output}")
 
 if __name__ == "__main__":